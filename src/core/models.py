@@ -1,6 +1,7 @@
 """
 Core domain models for the Shared Logistics Platform
 """
+import os
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -8,6 +9,12 @@ from typing import Optional
 from uuid import UUID, uuid4
 
 
+def uuid4_batch(n: int) -> list[UUID]:
+    """n random (version 4) UUIDs drawn with a single os.urandom call"""
+    raw = os.urandom(16 * n)
+    return [UUID(bytes=raw[i:i + 16], version=4) for i in range(0, 16 * n, 16)]
+
+
 class ShipmentStatus(Enum):
     PENDING = "pending"
     QUOTED = "quoted"
@@ -41,7 +48,7 @@ class EquipmentType(Enum):
     STEP_DECK = "step_deck"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Location:
     """Geographic location with address and coordinates"""
     id: UUID = field(default_factory=uuid4)
@@ -72,7 +79,7 @@ class Location:
         return c * r
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TimeWindow:
     """Time window for pickup or delivery"""
     earliest: datetime
@@ -94,7 +101,7 @@ class TimeWindow:
         )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Dimensions:
     """Physical dimensions of shipment"""
     length_inches: float = 0.0
@@ -117,7 +124,7 @@ class Dimensions:
         return self.weight_lbs / self.cubic_feet
 
 
-@dataclass
+@dataclass(slots=True)
 class Shipment:
     """A shipment to be transported"""
     id: UUID = field(default_factory=uuid4)
@@ -167,6 +174,47 @@ class Shipment:
         """How much flexibility in delivery timing"""
         return (self.delivery_window.latest - self.pickup_window.earliest).total_seconds() / 3600
 
+    @classmethod
+    def from_row(cls, table, i: int) -> "Shipment":
+        """
+        Materialize row i of a columnar shipment table (e.g. a pyarrow.Table)
+
+        The table has flat origin_*/dest_* location columns, pickup/delivery
+        window bounds, dimensions, equipment/commodity enum values and
+        requirement flags.
+        """
+        row = {name: table.column(name)[i].as_py() for name in table.column_names}
+
+        return cls(
+            origin=Location(
+                city=row["origin_city"],
+                state=row["origin_state"],
+                latitude=row["origin_lat"],
+                longitude=row["origin_lon"]
+            ),
+            destination=Location(
+                city=row["dest_city"],
+                state=row["dest_state"],
+                latitude=row["dest_lat"],
+                longitude=row["dest_lon"]
+            ),
+            pickup_window=TimeWindow(earliest=row["pickup_start"], latest=row["pickup_end"]),
+            delivery_window=TimeWindow(
+                earliest=row["delivery_start"],
+                latest=row["delivery_end"]
+            ),
+            dimensions=Dimensions(
+                weight_lbs=row["weight_lbs"],
+                linear_feet=row["linear_feet"],
+                pallet_count=row["pallet_count"],
+                stackable=row["stackable"]
+            ),
+            equipment_required=EquipmentType(row["equipment"]),
+            commodity_type=CommodityType(row["commodity"]),
+            requires_liftgate=row["requires_liftgate"],
+            requires_appointment=row["requires_appointment"]
+        )
+
 
 @dataclass
 class Carrier:
@@ -11,17 +11,42 @@ No Google Maps API required - completely free and open source!
 """
 import httpx
 import asyncio
+import numpy as np
 from dataclasses import dataclass
 from typing import List, Optional, Tuple, Dict, Any
 from functools import lru_cache
 import structlog
 import json
+from cachetools import LRUCache, TTLCache
+from itertools import chain
 from math import radians, cos, sin, asin, sqrt
 
+try:
+    import ijson
+except ImportError:  # pragma: no cover - streaming is optional
+    ijson = None
+
 logger = structlog.get_logger()
 
+# Unit conversion constants
+METERS_PER_MILE = 1609.34
+INV_METERS_PER_MILE = 1 / METERS_PER_MILE
+EARTH_RADIUS_MILES = 3956.0
+
+
+class _AsyncByteReader:
+    """Adapt an async byte iterator to the ``read()`` interface ijson expects"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""
+        return await anext(self._chunks, b"")
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GeocodingResult:
     """Result from geocoding operation"""
     address: str
@@ -36,7 +61,7 @@ class GeocodingResult:
     raw_response: Dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RouteResult:
     """Result from routing operation"""
     distance_meters: float
@@ -49,13 +74,13 @@ class RouteResult:
     fuel_cost_estimate: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True, eq=False)  # ndarray fields have no scalar __eq__
 class DistanceMatrixResult:
     """Result from distance matrix calculation"""
     origins: List[Tuple[float, float]]
     destinations: List[Tuple[float, float]]
-    distances: List[List[float]]  # meters
-    durations: List[List[float]]  # seconds
+    distances: np.ndarray  # meters, shape (len(origins), len(destinations))
+    durations: np.ndarray  # seconds, NaN where no route exists
 
 
 class NominatimGeocoder:
@@ -70,7 +95,8 @@ class NominatimGeocoder:
     def __init__(
         self,
         base_url: str = "https://nominatim.openstreetmap.org",
-        user_agent: str = "SharedLogisticsPlatform/1.0"
+        user_agent: str = "SharedLogisticsPlatform/1.0",
+        cache_size: int = 10_000
     ):
         self.base_url = base_url
         self.user_agent = user_agent
@@ -78,11 +104,14 @@ class NominatimGeocoder:
             timeout=30.0,
             headers={"User-Agent": user_agent}
         )
+        self.cache_size = cache_size
+        self._cache: LRUCache = LRUCache(maxsize=max(cache_size, 1))
 
     async def geocode(
         self,
         address: str,
-        country_codes: List[str] = None
+        country_codes: List[str] = None,
+        use_cache: bool = True
     ) -> Optional[GeocodingResult]:
         """
         Convert address to coordinates
@@ -90,10 +119,19 @@ class NominatimGeocoder:
         Args:
             address: Full or partial address string
             country_codes: List of ISO 3166-1 alpha-2 codes to restrict search
+            use_cache: Serve repeated lookups from the LRU cache
 
         Returns:
             GeocodingResult or None if not found
         """
+        cache_key = (
+            " ".join(address.lower().split()),
+            ",".join(country_codes) if country_codes else None
+        )
+
+        if use_cache and cache_key in self._cache:
+            return self._cache[cache_key]
+
         params = {
             "q": address,
             "format": "json",
@@ -119,7 +157,7 @@ class NominatimGeocoder:
             result = results[0]
             addr = result.get("address", {})
 
-            return GeocodingResult(
+            geocoded = GeocodingResult(
                 address=result.get("display_name", ""),
                 city=addr.get("city") or addr.get("town") or addr.get("village", ""),
                 state=addr.get("state", ""),
@@ -136,6 +174,15 @@ class NominatimGeocoder:
             logger.error("geocoding_error", address=address, error=str(e))
             return None
 
+        if use_cache and self.cache_size > 0:
+            self._cache[cache_key] = geocoded
+
+        return geocoded
+
+    def cache_clear(self):
+        """Drop all cached geocoding results"""
+        self._cache.clear()
+
     async def reverse_geocode(
         self,
         latitude: float,
@@ -232,9 +279,46 @@ class OSRMRouter:
         self.client = httpx.AsyncClient(timeout=60.0)
 
         # Cost estimates
-        self.fuel_price_per_gallon = 3.50
-        self.mpg = 6.5  # Truck MPG
+        self._fuel_price_per_gallon = 3.50
+        self._mpg = 6.5  # Truck MPG
         self.toll_rate_per_mile = 0.15  # Average estimate
+        self._update_cost_rates()
+
+    @property
+    def fuel_price_per_gallon(self) -> float:
+        return self._fuel_price_per_gallon
+
+    @fuel_price_per_gallon.setter
+    def fuel_price_per_gallon(self, value: float):
+        self._fuel_price_per_gallon = value
+        self._update_cost_rates()
+
+    @property
+    def mpg(self) -> float:
+        return self._mpg
+
+    @mpg.setter
+    def mpg(self, value: float):
+        self._mpg = value
+        self._update_cost_rates()
+
+    def _update_cost_rates(self):
+        """Precompute per-mile cost multipliers from the cost estimates"""
+        self._fuel_cost_per_mile = self._fuel_price_per_gallon / self._mpg
+
+    def set_cost_estimates(
+        self,
+        fuel_price_per_gallon: Optional[float] = None,
+        mpg: Optional[float] = None,
+        toll_rate_per_mile: Optional[float] = None
+    ):
+        """Update cost estimates; the per-mile rates refresh through the setters"""
+        if fuel_price_per_gallon is not None:
+            self.fuel_price_per_gallon = fuel_price_per_gallon
+        if mpg is not None:
+            self.mpg = mpg
+        if toll_rate_per_mile is not None:
+            self.toll_rate_per_mile = toll_rate_per_mile
 
     async def get_route(
         self,
@@ -293,21 +377,20 @@ class OSRMRouter:
             ]
 
             # Extract turn-by-turn instructions
-            instructions = []
-            for leg in route["legs"]:
-                for step in leg["steps"]:
-                    instructions.append({
-                        "instruction": step["maneuver"].get("instruction", ""),
-                        "type": step["maneuver"]["type"],
-                        "distance": step["distance"],
-                        "duration": step["duration"],
-                        "name": step.get("name", "")
-                    })
+            instructions = [
+                {
+                    "instruction": step["maneuver"].get("instruction", ""),
+                    "type": step["maneuver"]["type"],
+                    "distance": step["distance"],
+                    "duration": step["duration"],
+                    "name": step.get("name", "")
+                }
+                for step in chain.from_iterable(leg["steps"] for leg in route["legs"])
+            ]
 
             # Calculate costs
-            distance_miles = distance_meters / 1609.34
-            fuel_gallons = distance_miles / self.mpg
-            fuel_cost = fuel_gallons * self.fuel_price_per_gallon
+            distance_miles = distance_meters * INV_METERS_PER_MILE
+            fuel_cost = distance_miles * self._fuel_cost_per_mile
             toll_cost = distance_miles * self.toll_rate_per_mile
 
             return RouteResult(
@@ -357,29 +440,73 @@ class OSRMRouter:
             "annotations": "distance,duration"
         }
 
+        shape = (len(origins), len(destinations))
+
         try:
-            response = await self.client.get(
+            async with self.client.stream(
+                "GET",
                 f"{self.base_url}/table/v1/{self.profile}/{coords_str}",
                 params=params
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("code") != "Ok":
-                logger.warning("distance_matrix_failed", code=data.get("code"))
+            ) as response:
+                response.raise_for_status()
+                if ijson is not None:
+                    code, distances, durations = await self._stream_table(response, shape)
+                else:
+                    data = json.loads(await response.aread())
+                    code = data.get("code")
+                    distances = np.array(data.get("distances", []), dtype=np.float32)
+                    durations = np.array(data.get("durations", []), dtype=np.float32)
+
+            if code != "Ok":
+                logger.warning("distance_matrix_failed", code=code)
                 return None
 
             return DistanceMatrixResult(
                 origins=origins,
                 destinations=destinations,
-                distances=data["distances"],
-                durations=data["durations"]
+                distances=distances,
+                durations=durations
             )
 
         except httpx.HTTPError as e:
             logger.error("distance_matrix_error", error=str(e))
             return None
 
+    @staticmethod
+    async def _stream_table(
+        response: httpx.Response,
+        shape: Tuple[int, int]
+    ) -> Tuple[Optional[str], np.ndarray, np.ndarray]:
+        """
+        Parse an OSRM table response incrementally
+
+        Matrix cells are written straight into preallocated float32 arrays
+        so the full JSON object graph is never materialized.
+        """
+        matrices = {
+            "distances": np.full(shape, np.nan, dtype=np.float32),
+            "durations": np.full(shape, np.nan, dtype=np.float32),
+        }
+        rows = {"distances.item": -1, "durations.item": -1}
+        cols = {"distances.item": 0, "durations.item": 0}
+        code = None
+
+        reader = _AsyncByteReader(response.aiter_bytes())
+        async for prefix, event, value in ijson.parse_async(reader, use_float=True):
+            if prefix == "code":
+                code = value
+            elif prefix in rows and event == "start_array":
+                rows[prefix] += 1
+                cols[prefix] = 0
+            elif prefix.endswith(".item.item"):
+                row_prefix = prefix[:-5]
+                if row_prefix in rows:
+                    if value is not None:
+                        matrices[row_prefix[:-5]][rows[row_prefix], cols[row_prefix]] = value
+                    cols[row_prefix] += 1
+
+        return code, matrices["distances"], matrices["durations"]
+
     async def optimize_route(
         self,
         locations: List[Tuple[float, float]],
@@ -435,6 +562,116 @@ class OSRMRouter:
         await self.client.aclose()
 
 
+def haversine_miles(
+    lat1: np.ndarray,
+    lon1: np.ndarray,
+    lat2: np.ndarray,
+    lon2: np.ndarray
+) -> np.ndarray:
+    """Vectorized haversine distance in miles between coordinate arrays (degrees)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+def haversine_matrix(points: List[Tuple[float, float]]) -> np.ndarray:
+    """
+    Pairwise haversine distance matrix in miles for (lat, lon) points
+
+    Uses sin^2(x/2) = (1 - cos x) / 2 with the angle-difference identity so
+    all trig is evaluated once per point; each pair then costs only the
+    outer products plus one arcsin/sqrt.
+    """
+    coords = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+    lats, lons = coords[:, 0], coords[:, 1]
+
+    sin_lat, cos_lat = np.sin(lats), np.cos(lats)
+    sin_lon, cos_lon = np.sin(lons), np.cos(lons)
+
+    cos_lat_outer = np.outer(cos_lat, cos_lat)
+    cos_dlat = cos_lat_outer + np.outer(sin_lat, sin_lat)
+    cos_dlon = np.outer(cos_lon, cos_lon) + np.outer(sin_lon, sin_lon)
+
+    a = (1 - cos_dlat) / 2 + cos_lat_outer * (1 - cos_dlon) / 2
+    np.clip(a, 0.0, 1.0, out=a)
+    distances = 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+    np.fill_diagonal(distances, 0.0)
+
+    return distances
+
+
+class _HaversineBatcher:
+    """
+    Coalesce concurrent haversine requests into one NumPy evaluation
+
+    Requests are queued until ``max_batch`` are pending or ``max_delay``
+    seconds have passed since the first one, then resolved together.
+    """
+
+    def __init__(self, max_batch: int = 256, max_delay: float = 0.001):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Tuple[float, float], Tuple[float, float], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def submit(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float]
+    ) -> asyncio.Future:
+        """
+        Queue a pair and return a future resolving to its distance in miles
+
+        Points are coerced to floats up front, so a malformed pair fails only
+        its own caller instead of the whole batch.
+        """
+        origin = (float(origin[0]), float(origin[1]))
+        destination = (float(destination[0]), float(destination[1]))
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((origin, destination, future))
+
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self.flush)
+
+        return future
+
+    def flush(self):
+        """Resolve every pending request with a single vectorized call"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        try:
+            coords = np.array(
+                [(o[0], o[1], d[0], d[1]) for o, d, _ in pending],
+                dtype=np.float64
+            )
+            distances = haversine_miles(coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3])
+        except Exception as exc:
+            # Last resort (inputs are validated in submit): fail the whole
+            # batch rather than leave its callers waiting forever
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, _, future), distance in zip(pending, distances.tolist()):
+            if not future.done():
+                future.set_result(distance)
+
+
 class MapLibreService:
     """
     Main MapLibre service combining geocoding and routing
@@ -446,13 +683,19 @@ class MapLibreService:
         self,
         nominatim_url: str = "https://nominatim.openstreetmap.org",
         osrm_url: str = "https://router.project-osrm.org",
-        cache_enabled: bool = True
+        cache_enabled: bool = True,
+        distance_cache_size: int = 50_000,
+        distance_cache_ttl: float = 86400
     ):
         self.geocoder = NominatimGeocoder(base_url=nominatim_url)
         self.router = OSRMRouter(base_url=osrm_url)
         self.cache_enabled = cache_enabled
-        self._geocode_cache: Dict[str, GeocodingResult] = {}
-        self._distance_cache: Dict[str, float] = {}
+        # Bounded and expiring so long-lived services pick up OSRM data updates
+        self._distance_cache: TTLCache = TTLCache(
+            maxsize=distance_cache_size,
+            ttl=distance_cache_ttl
+        )
+        self._haversine_batcher = _HaversineBatcher()
 
     async def geocode_address(
         self,
@@ -460,15 +703,11 @@ class MapLibreService:
         use_cache: bool = True
     ) -> Optional[GeocodingResult]:
         """Geocode an address with optional caching"""
-        if use_cache and self.cache_enabled and address in self._geocode_cache:
-            return self._geocode_cache[address]
-
-        result = await self.geocoder.geocode(address, country_codes=["us"])
-
-        if result and self.cache_enabled:
-            self._geocode_cache[address] = result
-
-        return result
+        return await self.geocoder.geocode(
+            address,
+            country_codes=["us"],
+            use_cache=use_cache and self.cache_enabled
+        )
 
     async def get_driving_route(
         self,
@@ -496,7 +735,7 @@ class MapLibreService:
         Returns:
             Distance in miles
         """
-        cache_key = f"{origin[0]:.4f},{origin[1]:.4f}-{destination[0]:.4f},{destination[1]:.4f}"
+        cache_key = self._distance_cache_key(origin, destination)
 
         if self.cache_enabled and cache_key in self._distance_cache:
             return self._distance_cache[cache_key]
@@ -515,6 +754,42 @@ class MapLibreService:
 
         return distance
 
+    async def calculate_distance_async(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float]
+    ) -> float:
+        """
+        Haversine distance in miles, batched with other concurrent callers
+
+        Callers running concurrently (e.g. under ``asyncio.gather``) share a
+        single vectorized evaluation instead of one scalar call each. Results
+        are not cached: the distance cache holds road distances, and the
+        batched haversine is cheaper than a cache lookup anyway.
+        """
+        return await self._haversine_batcher.submit(origin, destination)
+
+    def calculate_distances(
+        self,
+        pairs: List[Tuple[Tuple[float, float], Tuple[float, float]]]
+    ) -> List[float]:
+        """Haversine distances in miles for a list of (origin, destination) pairs"""
+        if not pairs:
+            return []
+
+        coords = np.array(
+            [(o[0], o[1], d[0], d[1]) for o, d in pairs],
+            dtype=np.float64
+        )
+        return haversine_miles(coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3]).tolist()
+
+    @staticmethod
+    def _distance_cache_key(
+        origin: Tuple[float, float],
+        destination: Tuple[float, float]
+    ) -> str:
+        return f"{origin[0]:.4f},{origin[1]:.4f}-{destination[0]:.4f},{destination[1]:.4f}"
+
     def _haversine_distance(
         self,
         point1: Tuple[float, float],
@@ -530,7 +805,7 @@ class MapLibreService:
         a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
         c = 2 * asin(sqrt(a))
 
-        return c * 3956  # Earth radius in miles
+        return c * EARTH_RADIUS_MILES
 
     async def build_distance_matrix(
         self,
@@ -539,6 +814,13 @@ class MapLibreService:
         """Build distance matrix for multiple locations"""
         return await self.router.get_distance_matrix(locations, locations)
 
+    def build_haversine_matrix(
+        self,
+        locations: List[Tuple[float, float]]
+    ) -> np.ndarray:
+        """Straight-line distance matrix in miles, without a routing request"""
+        return haversine_matrix(locations)
+
     async def optimize_multi_stop_route(
         self,
         stops: List[Tuple[float, float]],
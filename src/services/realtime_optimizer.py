@@ -11,19 +11,128 @@ Continuously optimizes routes and pooling as new information arrives:
 Uses event-driven architecture with rolling horizon optimization.
 """
 import asyncio
-from dataclasses import dataclass, field
+import itertools
+import os
+import random
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable, Any
+from math import radians, sin, cos, asin, sqrt
+from typing import Dict, List, Optional, Callable, Any, Tuple, Awaitable
 from uuid import UUID
 from enum import Enum
 import structlog
+from scipy.spatial import cKDTree
 
-from ..core.models import Shipment, Carrier, Route
-from ..core.matching.pooling_engine import PoolingEngine, PoolingConfig
+from ..core.models import Shipment, Carrier, Route, RouteStop
+from ..core.matching.pooling_engine import PoolingEngine, PoolingConfig, PoolingResult
 from ..core.optimization import ALNS, ALNSSolution, ALNSConfig
 
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is optional
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 logger = structlog.get_logger()
 
+_EPOCH = datetime(1970, 1, 1)
+
+# Queued after the last callback to tell the callback worker to exit
+_CALLBACKS_DONE = object()
+
+
+def _posix_seconds(dt: datetime) -> float:
+    """Seconds since the epoch for a naive UTC datetime"""
+    return (dt - _EPOCH).total_seconds()
+
+
+def _unit_vector(lat, lon) -> np.ndarray:
+    """
+    Map radian lat/lon to 3D unit vectors
+
+    Chord length between unit vectors grows monotonically with great-circle
+    distance, so a Euclidean KD-tree over them ranks neighbors correctly.
+    """
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _haversine_rad(lat1, lon1, lat2, lon2):
+    """Haversine distance in miles between points given in radians"""
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * 3956.0 * asin(sqrt(a))
+
+
+def _haversine_rad_array(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized haversine distance in miles between points given in radians"""
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * 3956.0 * np.arcsin(np.sqrt(a))
+
+
+# fastmath minus the no-inf/no-nan assumptions: the kernel seeds its minimum with inf
+_FASTMATH_FLAGS = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+@njit(cache=True, fastmath=_FASTMATH_FLAGS, nogil=True)
+def _insertion_cost_kernel(o_lat, o_lon, d_lat, d_lon, stop_lats, stop_lons):
+    """
+    Cheapest detour in miles for inserting a pickup/delivery pair into a route
+
+    Gap i sits between stops i-1 and i (gap 0 prepends, gap n appends).
+    The pickup must precede the delivery, so pairs with pickup gap i and
+    delivery gap j >= i are considered; the best is found in O(n) by
+    carrying the cheapest pickup insertion seen so far.
+    """
+    n = stop_lats.shape[0]
+    direct = _haversine_rad(o_lat, o_lon, d_lat, d_lon)
+    best = np.inf
+    best_pickup = np.inf
+
+    for i in range(n + 1):
+        to_prev_o = 0.0
+        to_prev_d = 0.0
+        to_next_o = 0.0
+        to_next_d = 0.0
+        removed = 0.0
+
+        if i > 0:
+            to_prev_o = _haversine_rad(stop_lats[i - 1], stop_lons[i - 1], o_lat, o_lon)
+            to_prev_d = _haversine_rad(stop_lats[i - 1], stop_lons[i - 1], d_lat, d_lon)
+        if i < n:
+            to_next_o = _haversine_rad(o_lat, o_lon, stop_lats[i], stop_lons[i])
+            to_next_d = _haversine_rad(d_lat, d_lon, stop_lats[i], stop_lons[i])
+        if 0 < i < n:
+            removed = _haversine_rad(
+                stop_lats[i - 1], stop_lons[i - 1], stop_lats[i], stop_lons[i]
+            )
+
+        # Pickup and delivery back to back in the same gap
+        same_gap = to_prev_o + direct + to_next_d - removed
+        if same_gap < best:
+            best = same_gap
+
+        # Delivery here, pickup in an earlier gap
+        delivery = to_prev_d + to_next_d - removed
+        if best_pickup + delivery < best:
+            best = best_pickup + delivery
+
+        pickup = to_prev_o + to_next_o - removed
+        if pickup < best_pickup:
+            best_pickup = pickup
+
+    return best
+
 
 class EventType(Enum):
     """Types of events that trigger re-optimization"""
@@ -39,6 +148,25 @@ class EventType(Enum):
     PERIODIC_OPTIMIZATION = "periodic_optimization"
 
 
+# Per-route columns mirrored into NumPy arrays (SoA) for vectorized scans
+ROUTE_SOA_COLUMNS = (
+    "n_shipments",
+    "centroid_lat",
+    "centroid_lon",
+    "radius_miles",
+)
+
+# Event types where only the latest queued event per entity matters; events
+# without an entity are only coalesced for the global periodic trigger
+COALESCIBLE_EVENT_TYPES = frozenset({
+    EventType.CARRIER_AVAILABLE,
+    EventType.CARRIER_UNAVAILABLE,
+    EventType.TRAFFIC_UPDATE,
+    EventType.WEATHER_ALERT,
+    EventType.PERIODIC_OPTIMIZATION,
+})
+
+
 @dataclass
 class OptimizationEvent:
     """Event that triggers optimization"""
@@ -78,23 +206,80 @@ class RealTimeOptimizer:
         pooling_engine: Optional[PoolingEngine] = None,
         optimization_interval_seconds: int = 60,
         rolling_horizon_hours: float = 24.0,
-        max_events_per_batch: int = 50
+        max_events_per_batch: int = 50,
+        insertion_candidates: int = 20,
+        insertion_full_scan_fallback: bool = True,
+        max_queue_size: int = 10_000
     ):
         self.pooling_engine = pooling_engine or PoolingEngine()
         self.optimization_interval = optimization_interval_seconds
         self.rolling_horizon_hours = rolling_horizon_hours
         self.max_events_per_batch = max_events_per_batch
+        self.insertion_candidates = insertion_candidates  # Nearest routes scored per shipment
+        self.insertion_full_scan_fallback = insertion_full_scan_fallback
 
         # State
-        self.event_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        # Bounded so producers get backpressure instead of growing memory
+        self.event_queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=max_queue_size)
+        self._event_sequence = itertools.count()  # Tie-breaker so events are never compared
+        self._queued_by_key: Dict[Tuple[EventType, Optional[UUID]], OptimizationEvent] = {}
         self.active_routes: Dict[UUID, Route] = {}
         self.pending_shipments: Dict[UUID, Shipment] = {}
         self.available_carriers: Dict[UUID, Carrier] = {}
+        self.shipment_to_route: Dict[UUID, UUID] = {}  # Reverse index for O(1) lookups
+        # Route id -> (stops list, stop POSIX times); the list is kept so a
+        # reassigned route.stops invalidates the mirror even at the same length
+        self._stop_times: Dict[UUID, Tuple[List[RouteStop], np.ndarray]] = {}
+        # Route id -> (stops list, (2, n) stop lat/lon radians), same invalidation
+        self._stop_coords: Dict[UUID, Tuple[List[RouteStop], np.ndarray]] = {}
+
+        # Spatial index over route centroids, rebuilt lazily when routes change
+        self._centroid_tree: Optional[cKDTree] = None
+        self._centroid_route_ids: List[UUID] = []
+        self._routes_without_stops: List[UUID] = []
+        self._centroid_dirty = True
+
+        # Array mirror of active routes, one row per route in insertion order
+        self._route_soa: Dict[str, np.ndarray] = {
+            column: np.zeros(64, dtype=np.float64) for column in ROUTE_SOA_COLUMNS
+        }
+        self._route_row: Dict[UUID, int] = {}
+        self._route_id_at_row: List[UUID] = []
+
+        # Bumped on any optimizer state change; periodic optimization skips when unchanged
+        self._state_version = 0
+        self._last_optimized_version = -1
+
+        # Versioned views of pending shipments and carriers; the value lists
+        # and pooling results are reused until the underlying dict changes
+        self._pending_version = 0
+        self._carriers_version = 0
+        self._pending_list_cache: Optional[Tuple[int, List[Shipment]]] = None
+        self._carrier_list_cache: Optional[Tuple[int, List[Carrier]]] = None
+        self._pooling_cache: Optional[Tuple[Tuple[int, int], PoolingResult]] = None
 
         # Callbacks
         self.on_route_updated: Optional[Callable[[Route], None]] = None
         self.on_shipment_pooled: Optional[Callable[[UUID, UUID], None]] = None
 
+        # Callbacks run on a background worker so slow consumers don't stall optimization
+        self._callback_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        self._callback_task: Optional[asyncio.Task] = None
+        self._inline_callback_tasks: set = set()  # Strong refs until inline coroutines finish
+        self.max_callbacks_per_batch = 50
+        self.callback_drain_timeout_s = 5.0  # Bound on delivering queued callbacks in stop()
+
+        # Event dispatch table; event types without a handler are skipped
+        self._handlers: Dict[
+            EventType, Callable[[List[OptimizationEvent]], Awaitable[OptimizationResult]]
+        ] = {
+            EventType.NEW_SHIPMENT: self._handle_new_shipments,
+            EventType.SHIPMENT_CANCELLED: self._handle_cancellations,
+            EventType.DELAY_REPORTED: self._handle_delays,
+            EventType.CARRIER_AVAILABLE: self._handle_carrier_available,
+            EventType.PERIODIC_OPTIMIZATION: self._run_periodic_optimization,
+        }
+
         # Statistics
         self.events_processed = 0
         self.optimizations_run = 0
@@ -103,6 +288,9 @@ class RealTimeOptimizer:
         # Control
         self._running = False
         self._optimization_task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None  # Insertion searches
+        self._executor_finalizer: Optional[weakref.finalize] = None
+        self._err_backoff_s = 0.5  # Grows exponentially across consecutive loop errors
 
     async def start(self):
         """Start the real-time optimizer"""
@@ -112,8 +300,9 @@ class RealTimeOptimizer:
         self._running = True
         logger.info("starting_realtime_optimizer")
 
-        # Start periodic optimization loop
+        # Start periodic optimization loop and callback worker
         self._optimization_task = asyncio.create_task(self._optimization_loop())
+        self._callback_task = asyncio.create_task(self._drain_callbacks())
 
     async def stop(self):
         """Stop the real-time optimizer"""
@@ -126,6 +315,29 @@ class RealTimeOptimizer:
             except asyncio.CancelledError:
                 pass
 
+        # Let the worker deliver everything already queued, cancelling it
+        # only if that takes longer than the drain timeout
+        callback_task, self._callback_task = self._callback_task, None
+        if callback_task:
+            try:
+                await asyncio.wait_for(
+                    self._finish_callbacks(callback_task), self.callback_drain_timeout_s
+                )
+            except asyncio.TimeoutError:
+                callback_task.cancel()
+                try:
+                    await callback_task
+                except asyncio.CancelledError:
+                    pass
+
+                dropped = 0
+                while not self._callback_queue.empty():
+                    if self._callback_queue.get_nowait() is not _CALLBACKS_DONE:
+                        dropped += 1
+                logger.warning("callback_drain_timeout", dropped=dropped)
+
+        self._shutdown_executor()
+
         logger.info(
             "stopped_realtime_optimizer",
             events_processed=self.events_processed,
@@ -135,12 +347,32 @@ class RealTimeOptimizer:
 
     async def submit_event(self, event: OptimizationEvent):
         """Submit an event for processing"""
-        # Priority queue uses (priority, timestamp, event) tuple
-        await self.event_queue.put((
-            event.priority,
-            event.timestamp.timestamp(),
-            event
-        ))
+        key = self._coalescing_key(event)
+        if key is not None:
+            queued = self._queued_by_key.get(key)
+
+            if queued is not None:
+                # Refresh the queued event in place instead of enqueuing a duplicate
+                queued.timestamp = event.timestamp
+                queued.data = event.data
+                return
+
+            self._queued_by_key[key] = event
+
+        # Priority queue uses (priority, timestamp, sequence, event) tuple
+        try:
+            await self.event_queue.put((
+                event.priority,
+                event.timestamp.timestamp(),
+                next(self._event_sequence),
+                event
+            ))
+        except BaseException:
+            # Put was cancelled or timed out under backpressure; release the
+            # coalescing slot so later events for this key are not dropped
+            if key is not None and self._queued_by_key.get(key) is event:
+                del self._queued_by_key[key]
+            raise
 
         logger.debug(
             "event_submitted",
@@ -148,25 +380,35 @@ class RealTimeOptimizer:
             entity_id=str(event.entity_id) if event.entity_id else None
         )
 
-    async def add_shipment(self, shipment: Shipment):
+    async def add_shipment(
+        self,
+        shipment: Shipment,
+        timestamp: Optional[datetime] = None
+    ):
         """Add a new shipment and trigger optimization"""
         self.pending_shipments[shipment.id] = shipment
+        self._mark_pending_changed()
 
         await self.submit_event(OptimizationEvent(
             event_type=EventType.NEW_SHIPMENT,
-            timestamp=datetime.utcnow(),
+            timestamp=timestamp or datetime.utcnow(),
             entity_id=shipment.id,
             priority=3  # High priority for new bookings
         ))
 
-    async def cancel_shipment(self, shipment_id: UUID):
+    async def cancel_shipment(
+        self,
+        shipment_id: UUID,
+        timestamp: Optional[datetime] = None
+    ):
         """Handle shipment cancellation"""
         if shipment_id in self.pending_shipments:
             del self.pending_shipments[shipment_id]
+            self._mark_pending_changed()
 
         await self.submit_event(OptimizationEvent(
             event_type=EventType.SHIPMENT_CANCELLED,
-            timestamp=datetime.utcnow(),
+            timestamp=timestamp or datetime.utcnow(),
             entity_id=shipment_id,
             priority=2  # High priority to free up capacity
         ))
@@ -174,7 +416,8 @@ class RealTimeOptimizer:
     async def update_carrier_availability(
         self,
         carrier: Carrier,
-        available: bool
+        available: bool,
+        timestamp: Optional[datetime] = None
     ):
         """Update carrier availability"""
         if available:
@@ -185,9 +428,11 @@ class RealTimeOptimizer:
                 del self.available_carriers[carrier.id]
             event_type = EventType.CARRIER_UNAVAILABLE
 
+        self._mark_carriers_changed()
+
         await self.submit_event(OptimizationEvent(
             event_type=event_type,
-            timestamp=datetime.utcnow(),
+            timestamp=timestamp or datetime.utcnow(),
             entity_id=carrier.id,
             priority=4
         ))
@@ -196,56 +441,166 @@ class RealTimeOptimizer:
         self,
         route_id: UUID,
         delay_minutes: float,
-        reason: str
+        reason: str,
+        timestamp: Optional[datetime] = None
     ):
         """Report a delay on an active route"""
         await self.submit_event(OptimizationEvent(
             event_type=EventType.DELAY_REPORTED,
-            timestamp=datetime.utcnow(),
+            timestamp=timestamp or datetime.utcnow(),
             entity_id=route_id,
             data={"delay_minutes": delay_minutes, "reason": reason},
             priority=1  # Highest priority for disruptions
         ))
 
     async def _optimization_loop(self):
-        """Main optimization loop"""
-        while self._running:
-            try:
-                # Wait for interval or events
-                await asyncio.sleep(self.optimization_interval)
+        """
+        Main optimization loop
 
-                # Process queued events
-                events = await self._collect_events()
+        Blocks on the queue until the first event arrives, then drains
+        whatever else is already queued into the same batch. Periodic
+        optimization runs whenever its deadline passes between batches.
+        """
+        loop = asyncio.get_running_loop()
+        next_periodic = loop.time() + self.optimization_interval
 
-                if events:
+        while self._running:
+            try:
+                try:
+                    first_event = self._dequeued(await asyncio.wait_for(
+                        self.event_queue.get(),
+                        timeout=max(next_periodic - loop.time(), 0)
+                    ))
+                except asyncio.TimeoutError:
+                    first_event = None
+
+                if first_event is not None:
+                    events = [first_event]
+                    events.extend(await self._collect_events(self.max_events_per_batch - 1))
                     await self._process_events(events)
 
                 # Periodic full optimization
-                await self.submit_event(OptimizationEvent(
-                    event_type=EventType.PERIODIC_OPTIMIZATION,
-                    timestamp=datetime.utcnow(),
-                    priority=8  # Lower priority than reactive events
-                ))
+                if loop.time() >= next_periodic:
+                    await self._run_periodic_optimization()
+                    next_periodic = loop.time() + self.optimization_interval
+
+                self._err_backoff_s = 0.5
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error("optimization_loop_error", error=str(e))
-                await asyncio.sleep(5)  # Back off on error
+                logger.error(
+                    "optimization_loop_error", error=str(e), backoff_s=self._err_backoff_s
+                )
+                # Exponential backoff with jitter: cheap for one-off failures,
+                # bounded for persistent ones
+                await asyncio.sleep(self._err_backoff_s + random.random() * 0.1)
+                self._err_backoff_s = min(self._err_backoff_s * 2, 30.0)
+
+    def _notify(self, callback: Optional[Callable[..., Any]], *args: Any):
+        """Hand a callback invocation to the background worker"""
+        if callback is None:
+            return
+
+        # Without a running worker (optimizer not started), call inline
+        if self._callback_task is None:
+            result = callback(*args)
+            if asyncio.iscoroutine(result):
+                task = asyncio.ensure_future(result)
+                self._inline_callback_tasks.add(task)
+                task.add_done_callback(self._inline_callback_done)
+            return
+
+        try:
+            self._callback_queue.put_nowait((callback, args))
+        except asyncio.QueueFull:
+            logger.warning("callback_queue_full", callback=getattr(callback, "__name__", None))
+
+    def _inline_callback_done(self, task: asyncio.Task):
+        """Release an inline callback task and log its failure, if any"""
+        self._inline_callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("callback_error", error=str(task.exception()))
+
+    async def _drain_callbacks(self):
+        """Background worker delivering queued callbacks in batches until _CALLBACKS_DONE"""
+        done = False
+        while not done:
+            batch = []
+            item = await self._callback_queue.get()
+
+            while True:
+                if item is _CALLBACKS_DONE:
+                    done = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_callbacks_per_batch:
+                    break
+                try:
+                    item = self._callback_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+
+            await self._run_callbacks(batch)
+
+    async def _finish_callbacks(self, callback_task: asyncio.Task):
+        """Queue the stop marker behind pending callbacks and wait for the worker"""
+        await self._callback_queue.put(_CALLBACKS_DONE)
+        await callback_task
+
+    async def _run_callbacks(self, batch: List[Tuple[Callable[..., Any], Tuple[Any, ...]]]):
+        """Invoke callbacks, awaiting any coroutine results together"""
+        pending = []
+
+        for callback, args in batch:
+            try:
+                result = callback(*args)
+            except Exception as e:
+                logger.error("callback_error", error=str(e))
+                continue
 
-    async def _collect_events(self) -> List[OptimizationEvent]:
-        """Collect events from queue"""
+            if asyncio.iscoroutine(result):
+                pending.append(result)
+
+        if pending:
+            for outcome in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(outcome, Exception):
+                    logger.error("callback_error", error=str(outcome))
+
+    async def _collect_events(self, limit: Optional[int] = None) -> List[OptimizationEvent]:
+        """Collect already-queued events without waiting"""
         events = []
+        limit = self.max_events_per_batch if limit is None else limit
 
-        while not self.event_queue.empty() and len(events) < self.max_events_per_batch:
+        while len(events) < limit:
             try:
-                priority, timestamp, event = self.event_queue.get_nowait()
-                events.append(event)
+                item = self.event_queue.get_nowait()
             except asyncio.QueueEmpty:
                 break
+            events.append(self._dequeued(item))
 
         return events
 
+    def _dequeued(self, item: Tuple[int, float, int, OptimizationEvent]) -> OptimizationEvent:
+        """Unwrap a queue item and release its coalescing slot"""
+        event = item[-1]
+
+        key = self._coalescing_key(event)
+        if key is not None and self._queued_by_key.get(key) is event:
+            del self._queued_by_key[key]
+
+        return event
+
+    @staticmethod
+    def _coalescing_key(event: OptimizationEvent) -> Optional[Tuple[EventType, Optional[UUID]]]:
+        """Key under which queued duplicates of an event merge, or None if it never merges"""
+        if event.event_type not in COALESCIBLE_EVENT_TYPES:
+            return None
+        # Traffic/weather alerts without an entity may cover different regions
+        if event.entity_id is None and event.event_type != EventType.PERIODIC_OPTIMIZATION:
+            return None
+        return (event.event_type, event.entity_id)
+
     async def _process_events(
         self,
         events: List[OptimizationEvent]
@@ -253,29 +608,23 @@ class RealTimeOptimizer:
         """Process a batch of events"""
         results = []
 
+        # Merge duplicate events per entity; merged-away events count as processed
+        coalesced = self._coalesce_events(events)
+        self.events_processed += len(events) - len(coalesced)
+
         # Group events by type for efficient processing
-        grouped = {}
-        for event in events:
-            if event.event_type not in grouped:
-                grouped[event.event_type] = []
+        grouped: Dict[EventType, List[OptimizationEvent]] = defaultdict(list)
+        for event in coalesced:
             grouped[event.event_type].append(event)
 
         # Process each event type
         for event_type, type_events in grouped.items():
-            try:
-                if event_type == EventType.NEW_SHIPMENT:
-                    result = await self._handle_new_shipments(type_events)
-                elif event_type == EventType.SHIPMENT_CANCELLED:
-                    result = await self._handle_cancellations(type_events)
-                elif event_type == EventType.DELAY_REPORTED:
-                    result = await self._handle_delays(type_events)
-                elif event_type == EventType.CARRIER_AVAILABLE:
-                    result = await self._handle_carrier_available(type_events)
-                elif event_type == EventType.PERIODIC_OPTIMIZATION:
-                    result = await self._run_periodic_optimization()
-                else:
-                    continue
+            handler = self._handlers.get(event_type)
+            if handler is None:
+                continue
 
+            try:
+                result = await handler(type_events)
                 results.append(result)
                 self.events_processed += len(type_events)
 
@@ -288,48 +637,96 @@ class RealTimeOptimizer:
 
         return results
 
+    def _coalesce_events(
+        self,
+        events: List[OptimizationEvent]
+    ) -> List[OptimizationEvent]:
+        """
+        Collapse events that target the same entity within a batch
+
+        - Delays on the same route are summed into one event
+        - Other repeated events keep only the latest
+        - A booking cancelled in the same batch, before it was routed,
+          drops both events
+        """
+        merged: Dict[Tuple[EventType, Optional[UUID]], OptimizationEvent] = {}
+
+        for event in events:
+            key = (event.event_type, event.entity_id)
+            previous = merged.get(key)
+
+            if previous is None:
+                merged[key] = event
+            elif event.event_type == EventType.DELAY_REPORTED:
+                total_delay = (
+                    previous.data.get("delay_minutes", 0) + event.data.get("delay_minutes", 0)
+                )
+                merged[key] = replace(
+                    event,
+                    data={**event.data, "delay_minutes": total_delay},
+                    priority=min(previous.priority, event.priority)
+                )
+            elif event.timestamp >= previous.timestamp:
+                merged[key] = event
+
+        booked = [key for key in merged if key[0] == EventType.NEW_SHIPMENT]
+        for key in booked:
+            shipment_id = key[1]
+            cancel_key = (EventType.SHIPMENT_CANCELLED, shipment_id)
+
+            if (
+                cancel_key in merged
+                and shipment_id not in self.pending_shipments
+                and shipment_id not in self.shipment_to_route
+            ):
+                del merged[key]
+                del merged[cancel_key]
+
+        return list(merged.values())
+
     async def _handle_new_shipments(
         self,
         events: List[OptimizationEvent]
     ) -> OptimizationResult:
         """Handle new shipment events - try to insert into existing routes"""
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
 
         inserted = 0
         savings = 0.0
 
-        for event in events:
-            shipment_id = event.entity_id
-            if shipment_id not in self.pending_shipments:
-                continue
+        shipments = list({
+            event.entity_id: self.pending_shipments[event.entity_id]
+            for event in events
+            if event.entity_id in self.pending_shipments
+        }.values())
 
-            shipment = self.pending_shipments[shipment_id]
+        # Per-shipment cost terms, computed once for the whole batch
+        precomp = {s.id: self._shipment_cost_terms(s) for s in shipments}
 
-            # Try to insert into existing route
-            best_route = await self._find_best_insertion(shipment)
+        # Try to insert into existing routes
+        best_routes = await self._find_best_insertions(shipments, precomp)
 
-            if best_route:
+        for shipment, best_route in zip(shipments, best_routes):
+            shipment_id = shipment.id
+
+            # Skip shipments cancelled while the searches were running
+            if best_route and shipment_id in self.pending_shipments:
                 # Insert shipment into route
-                best_route.shipment_ids.append(shipment_id)
+                self._attach_shipment(best_route, shipment_id)
                 inserted += 1
 
                 # Estimate savings
-                individual_cost = shipment.distance_miles * 2.5
-                insertion_cost = individual_cost * 0.3  # Roughly 30% marginal cost
+                _, individual_cost, insertion_cost, _ = precomp[shipment_id]
                 savings += individual_cost - insertion_cost
 
                 del self.pending_shipments[shipment_id]
+                self._mark_pending_changed()
 
-                if self.on_shipment_pooled:
-                    self.on_shipment_pooled(shipment_id, best_route.id)
+                self._notify(self.on_shipment_pooled, shipment_id, best_route.id)
 
         # For remaining shipments, run pooling optimization
         if self.pending_shipments:
-            pooling_result = self.pooling_engine.find_pooling_opportunities(
-                list(self.pending_shipments.values()),
-                list(self.available_carriers.values())
-            )
+            pooling_result = self._find_pooling_opportunities()
 
             if pooling_result.opportunities:
                 # Create routes from opportunities
@@ -337,16 +734,17 @@ class RealTimeOptimizer:
                     route = opp.optimized_route or Route(
                         shipment_ids=opp.shipment_ids
                     )
-                    self.active_routes[route.id] = route
+                    self._add_route(route)
 
                     for sid in opp.shipment_ids:
                         if sid in self.pending_shipments:
                             del self.pending_shipments[sid]
+                            self._mark_pending_changed()
 
                     inserted += len(opp.shipment_ids)
                     savings += opp.total_savings
 
-        computation_time = (time.time() - start_time) * 1000
+        computation_time = (time.perf_counter_ns() - start_time) / 1_000_000
         self.total_savings += savings
         self.optimizations_run += 1
 
@@ -359,7 +757,7 @@ class RealTimeOptimizer:
 
         return OptimizationResult(
             event=events[0],
-            routes_modified=len([r for r in self.active_routes.values()]),
+            routes_modified=len(self.active_routes),
             shipments_affected=inserted,
             savings_achieved=savings,
             computation_time_ms=computation_time,
@@ -372,20 +770,14 @@ class RealTimeOptimizer:
         events: List[OptimizationEvent]
     ) -> OptimizationResult:
         """Handle shipment cancellation events"""
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
 
         affected_routes = set()
 
         for event in events:
-            shipment_id = event.entity_id
-
-            # Find and update affected route
-            for route in self.active_routes.values():
-                if shipment_id in route.shipment_ids:
-                    route.shipment_ids.remove(shipment_id)
-                    affected_routes.add(route.id)
-                    break
+            route = self._detach_shipment(event.entity_id)
+            if route:
+                affected_routes.add(route.id)
 
         # Re-optimize affected routes
         for route_id in affected_routes:
@@ -396,10 +788,9 @@ class RealTimeOptimizer:
                 # Mark for individual handling
                 pass
 
-            if self.on_route_updated:
-                self.on_route_updated(route)
+            self._notify(self.on_route_updated, route)
 
-        computation_time = (time.time() - start_time) * 1000
+        computation_time = (time.perf_counter_ns() - start_time) / 1_000_000
 
         return OptimizationResult(
             event=events[0],
@@ -416,32 +807,36 @@ class RealTimeOptimizer:
         events: List[OptimizationEvent]
     ) -> OptimizationResult:
         """Handle delay events - reschedule downstream stops"""
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
 
         affected_routes = 0
+        now_ts = _posix_seconds(datetime.utcnow())
 
+        # Delays compound on the same upcoming stops, so sum them per route
+        route_delays: Dict[UUID, float] = defaultdict(float)
         for event in events:
-            route_id = event.entity_id
-            delay_minutes = event.data.get("delay_minutes", 0)
-
-            if route_id not in self.active_routes:
-                continue
+            if event.entity_id in self.active_routes:
+                route_delays[event.entity_id] += event.data.get("delay_minutes", 0)
 
+        for route_id, delay_minutes in route_delays.items():
             route = self.active_routes[route_id]
 
-            # Update scheduled times for remaining stops
-            for stop in route.stops:
-                if stop.scheduled_time > datetime.utcnow():
-                    stop.scheduled_time += timedelta(minutes=delay_minutes)
+            # Shift all remaining stops with one masked add
+            stop_times = self._route_stop_times(route)
+            upcoming = stop_times > now_ts
+            stop_times[upcoming] += delay_minutes * 60.0
+
+            delay = timedelta(minutes=delay_minutes)
+            for idx in np.flatnonzero(upcoming):
+                route.stops[idx].scheduled_time += delay
 
             affected_routes += 1
+            self._state_version += 1
 
             # Notify downstream parties
-            if self.on_route_updated:
-                self.on_route_updated(route)
+            self._notify(self.on_route_updated, route)
 
-        computation_time = (time.time() - start_time) * 1000
+        computation_time = (time.perf_counter_ns() - start_time) / 1_000_000
 
         logger.info(
             "delays_processed",
@@ -464,21 +859,17 @@ class RealTimeOptimizer:
         events: List[OptimizationEvent]
     ) -> OptimizationResult:
         """Handle new carrier availability - match with pending shipments"""
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
 
         matched = 0
 
         if self.pending_shipments and self.available_carriers:
             # Run matching
-            pooling_result = self.pooling_engine.find_pooling_opportunities(
-                list(self.pending_shipments.values()),
-                list(self.available_carriers.values())
-            )
+            pooling_result = self._find_pooling_opportunities()
 
             matched = pooling_result.shipments_pooled
 
-        computation_time = (time.time() - start_time) * 1000
+        computation_time = (time.perf_counter_ns() - start_time) / 1_000_000
 
         return OptimizationResult(
             event=events[0],
@@ -490,63 +881,418 @@ class RealTimeOptimizer:
             message=f"Matched {matched} shipments with new carriers"
         )
 
-    async def _run_periodic_optimization(self) -> OptimizationResult:
+    async def _run_periodic_optimization(
+        self,
+        events: Optional[List[OptimizationEvent]] = None
+    ) -> OptimizationResult:
         """Run full periodic optimization"""
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
+
+        event = events[0] if events else OptimizationEvent(
+            event_type=EventType.PERIODIC_OPTIMIZATION,
+            timestamp=datetime.utcnow()
+        )
+
+        # Nothing changed since the last run - skip the route walk entirely
+        if self._state_version == self._last_optimized_version:
+            return OptimizationResult(
+                event=event,
+                routes_modified=0,
+                shipments_affected=0,
+                savings_achieved=0,
+                computation_time_ms=(time.perf_counter_ns() - start_time) / 1_000_000,
+                success=True,
+                message="Periodic optimization skipped, state unchanged"
+            )
 
         # Use ALNS to improve existing routes
         improvements = 0.0
 
-        for route_id, route in self.active_routes.items():
-            if len(route.shipment_ids) < 2:
-                continue
+        num_routes = len(self._route_id_at_row)
+        n_shipments = self._route_soa["n_shipments"][:num_routes]
 
-            # Would run ALNS here to improve route
-            # For now, skip
+        # Would run ALNS here on the routes with 2+ shipments, i.e. the rows
+        # np.flatnonzero(n_shipments >= 2) of self._route_id_at_row
+        # For now, skip
 
-        computation_time = (time.time() - start_time) * 1000
+        computation_time = (time.perf_counter_ns() - start_time) / 1_000_000
         self.optimizations_run += 1
+        self._last_optimized_version = self._state_version
 
         return OptimizationResult(
-            event=OptimizationEvent(
-                event_type=EventType.PERIODIC_OPTIMIZATION,
-                timestamp=datetime.utcnow()
-            ),
+            event=event,
             routes_modified=len(self.active_routes),
-            shipments_affected=sum(len(r.shipment_ids) for r in self.active_routes.values()),
+            shipments_affected=int(n_shipments.sum()),
             savings_achieved=improvements,
             computation_time_ms=computation_time,
             success=True,
             message="Periodic optimization complete"
         )
 
-    async def _find_best_insertion(
+    def _mark_pending_changed(self):
+        """Record a change to pending shipments"""
+        self._pending_version += 1
+        self._state_version += 1
+
+    def _mark_carriers_changed(self):
+        """Record a change to available carriers"""
+        self._carriers_version += 1
+        self._state_version += 1
+
+    def _pending_list(self) -> List[Shipment]:
+        """Pending shipments as a list, rebuilt only after they change"""
+        cache = self._pending_list_cache
+        if cache is None or cache[0] != self._pending_version:
+            self._pending_list_cache = (
+                self._pending_version, list(self.pending_shipments.values())
+            )
+        return self._pending_list_cache[1]
+
+    def _carrier_list(self) -> List[Carrier]:
+        """Available carriers as a list, rebuilt only after they change"""
+        cache = self._carrier_list_cache
+        if cache is None or cache[0] != self._carriers_version:
+            self._carrier_list_cache = (
+                self._carriers_version, list(self.available_carriers.values())
+            )
+        return self._carrier_list_cache[1]
+
+    def _find_pooling_opportunities(self) -> PoolingResult:
+        """Run the pooling engine, reusing the last result if its inputs are unchanged"""
+        version = (self._pending_version, self._carriers_version)
+
+        if self._pooling_cache and self._pooling_cache[0] == version:
+            return self._pooling_cache[1]
+
+        result = self.pooling_engine.find_pooling_opportunities(
+            self._pending_list(),
+            self._carrier_list()
+        )
+        self._pooling_cache = (version, result)
+
+        return result
+
+    async def _find_best_insertions(
         self,
-        shipment: Shipment
+        shipments: List[Shipment],
+        precomp: Optional[Dict[UUID, Tuple[float, float, float, float]]] = None
+    ) -> List[Optional[Route]]:
+        """
+        Find the best insertion route for each shipment concurrently
+
+        Insertion cost depends only on route stops, which attaching a
+        shipment does not change, so searches against one snapshot of the
+        routes are independent and can run on worker threads.
+        """
+        if not shipments:
+            return []
+
+        if precomp is None:
+            precomp = {s.id: self._shipment_cost_terms(s) for s in shipments}
+
+        self._prepare_insertion_search()
+        routes = dict(self.active_routes)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+            # Optimizers driven without start()/stop() still release the
+            # worker threads once they are garbage collected
+            self._executor_finalizer = weakref.finalize(
+                self, self._executor.shutdown, wait=False
+            )
+
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(
+            loop.run_in_executor(
+                self._executor, self._find_best_insertion_sync,
+                shipment, routes, precomp[shipment.id]
+            )
+            for shipment in shipments
+        ))
+
+    def _shutdown_executor(self):
+        """Stop the insertion worker threads, if any were started"""
+        if self._executor_finalizer is not None:
+            self._executor_finalizer()  # Calls executor.shutdown once
+            self._executor_finalizer = None
+        self._executor = None
+
+    def _prepare_insertion_search(self):
+        """Warm per-route caches so insertion searches only read shared state"""
+        for route in self.active_routes.values():
+            self._route_stop_coords(route)
+
+        self._refresh_centroid_tree()
+
+    @staticmethod
+    def _shipment_cost_terms(shipment: Shipment) -> Tuple[float, float, float, float]:
+        """
+        Derived cost terms for a shipment
+
+        Returns:
+            (distance, individual cost, marginal insertion cost, max acceptable
+            insertion cost increase)
+        """
+        distance = shipment.distance_miles
+        individual_cost = distance * 2.5
+        # Roughly 30% marginal cost
+        return distance, individual_cost, individual_cost * 0.3, distance * 0.5
+
+    def _find_best_insertion_sync(
+        self,
+        shipment: Shipment,
+        routes: Dict[UUID, Route],
+        cost_terms: Tuple[float, float, float, float]
     ) -> Optional[Route]:
-        """Find the best existing route to insert a shipment"""
+        """Best insertion search over a snapshot of the active routes"""
+        distance, _, _, max_cost_increase = cost_terms
+        rough_cost_increase = distance * 0.3  # Estimate for routes without stops
+
+        candidates = self._nearby_routes(shipment, routes)
+        best_route, best_cost_increase = self._score_insertions(
+            shipment, candidates, rough_cost_increase
+        )
+
+        # Shortlist found nothing usable - optionally widen to every route
+        if (
+            best_cost_increase >= max_cost_increase
+            and self.insertion_full_scan_fallback
+            and len(candidates) < len(routes)
+        ):
+            best_route, best_cost_increase = self._score_insertions(
+                shipment, list(routes.values()), rough_cost_increase
+            )
+
+        # Only return if insertion cost is reasonable
+        if best_route and best_cost_increase < max_cost_increase:
+            return best_route
+
+        return None
+
+    def _score_insertions(
+        self,
+        shipment: Shipment,
+        routes: List[Route],
+        rough_cost_increase: float
+    ) -> Tuple[Optional[Route], float]:
+        """
+        Return the route with the cheapest insertion and its cost increase
+
+        Routes are scored in order of a lower bound on their insertion cost
+        and skipped once the bound reaches the best cost found so far. Every
+        stop lies within the route radius of its centroid, so by the triangle
+        inequality serving the pickup or delivery costs at least its distance
+        to the centroid minus twice the radius.
+        """
         best_route = None
         best_cost_increase = float('inf')
 
-        for route in self.active_routes.values():
-            # Check basic compatibility
-            # Same equipment, capacity available, time windows overlap
+        o_lat, o_lon = radians(shipment.origin.latitude), radians(shipment.origin.longitude)
+        d_lat, d_lon = (
+            radians(shipment.destination.latitude),
+            radians(shipment.destination.longitude)
+        )
+
+        soa = self._route_soa
+        rows = np.fromiter(
+            (self._route_row[route.id] for route in routes), dtype=np.intp, count=len(routes)
+        )
+        c_lat = np.radians(soa["centroid_lat"][rows])
+        c_lon = np.radians(soa["centroid_lon"][rows])
+        # NaN for routes without stops, which are never pruned
+        lower_bounds = np.maximum(
+            _haversine_rad_array(o_lat, o_lon, c_lat, c_lon),
+            _haversine_rad_array(d_lat, d_lon, c_lat, c_lon)
+        ) - 2 * soa["radius_miles"][rows]
+
+        for i in np.argsort(lower_bounds, kind="stable"):
+            if lower_bounds[i] >= best_cost_increase:
+                continue
 
-            # Calculate insertion cost
-            # This would use proper insertion heuristics
+            route = routes[i]
+            stop_lats, stop_lons = self._route_stop_coords(route)
 
-            cost_increase = shipment.distance_miles * 0.3  # Rough estimate
+            if len(stop_lats):
+                cost_increase = _insertion_cost_kernel(
+                    o_lat, o_lon, d_lat, d_lon, stop_lats, stop_lons
+                )
+            else:
+                # No stop geometry yet - rough estimate
+                cost_increase = rough_cost_increase
 
             if cost_increase < best_cost_increase:
                 best_cost_increase = cost_increase
                 best_route = route
 
-        # Only return if insertion cost is reasonable
-        if best_route and best_cost_increase < shipment.distance_miles * 0.5:
-            return best_route
+        return best_route, best_cost_increase
 
-        return None
+    def _nearby_routes(
+        self,
+        shipment: Shipment,
+        routes: Dict[UUID, Route]
+    ) -> List[Route]:
+        """Routes whose centroids are nearest the shipment pickup"""
+        if len(routes) <= self.insertion_candidates:
+            return list(routes.values())
+
+        # Routes without stops have no centroid and are always considered
+        route_ids = list(self._routes_without_stops)
+
+        if self._centroid_tree is not None:
+            k = min(self.insertion_candidates, len(self._centroid_route_ids))
+            _, rows = self._centroid_tree.query(
+                _unit_vector(
+                    radians(shipment.origin.latitude),
+                    radians(shipment.origin.longitude)
+                ),
+                k=k
+            )
+            route_ids.extend(self._centroid_route_ids[row] for row in np.atleast_1d(rows))
+
+        return [routes[route_id] for route_id in route_ids if route_id in routes]
+
+    def _refresh_centroid_tree(self):
+        """Rebuild the route centroid KD-tree if routes changed since the last build"""
+        if not self._centroid_dirty:
+            return
+
+        route_ids = []
+        centroids = []
+        self._routes_without_stops = []
+
+        for route in self.active_routes.values():
+            stop_lats, stop_lons = self._route_stop_coords(route)
+
+            if len(stop_lats):
+                # Project the mean back onto the sphere; for spread-out routes
+                # it lies well inside it, where chord distance stops tracking
+                # great-circle distance
+                centroid = _unit_vector(stop_lats, stop_lons).mean(axis=0)
+                norm = np.linalg.norm(centroid)
+                route_ids.append(route.id)
+                centroids.append(centroid / norm if norm > 0 else centroid)
+            else:
+                self._routes_without_stops.append(route.id)
+
+        self._centroid_tree = cKDTree(np.array(centroids)) if centroids else None
+        self._centroid_route_ids = route_ids
+        self._centroid_dirty = False
+
+    def _add_route(self, route: Route):
+        """Register a route as active and index its shipments"""
+        self.active_routes[route.id] = route
+        self._stop_times.pop(route.id, None)
+        self._stop_coords.pop(route.id, None)
+        self._centroid_dirty = True
+        self._state_version += 1
+
+        for sid in route.shipment_ids:
+            self.shipment_to_route[sid] = route.id
+
+        row = self._route_row.get(route.id)
+        if row is None:
+            row = self._allocate_route_row(route.id)
+
+        self._route_soa["n_shipments"][row] = len(route.shipment_ids)
+        self._route_stop_coords(route)  # Rebuilding the coords writes the centroid
+
+    def _allocate_route_row(self, route_id: UUID) -> int:
+        """Reserve the next SoA row, doubling the arrays when full"""
+        row = len(self._route_id_at_row)
+        capacity = len(self._route_soa["n_shipments"])
+
+        if row == capacity:
+            for column, values in self._route_soa.items():
+                grown = np.zeros(capacity * 2, dtype=values.dtype)
+                grown[:capacity] = values
+                self._route_soa[column] = grown
+
+        self._route_row[route_id] = row
+        self._route_id_at_row.append(route_id)
+
+        return row
+
+    def _update_route_centroid(self, route: Route):
+        """Write a route's stop centroid (degrees) and radius into its SoA row"""
+        stop_lats, stop_lons = self._route_stop_coords(route)
+        row = self._route_row[route.id]
+
+        if len(stop_lats):
+            c_lat, c_lon = stop_lats.mean(), stop_lons.mean()
+            self._route_soa["centroid_lat"][row] = np.degrees(c_lat)
+            self._route_soa["centroid_lon"][row] = np.degrees(c_lon)
+            self._route_soa["radius_miles"][row] = _haversine_rad_array(
+                stop_lats, stop_lons, c_lat, c_lon
+            ).max()
+        else:
+            self._route_soa["centroid_lat"][row] = np.nan
+            self._route_soa["centroid_lon"][row] = np.nan
+            self._route_soa["radius_miles"][row] = np.nan
+
+    def _route_has_shipment(self, route: Route, shipment_id: UUID) -> bool:
+        """O(1) membership test through the reverse index instead of the ordered list"""
+        return self.shipment_to_route.get(shipment_id) == route.id
+
+    def _attach_shipment(self, route: Route, shipment_id: UUID):
+        """Append a shipment to an active route"""
+        if self._route_has_shipment(route, shipment_id):
+            return
+
+        route.shipment_ids.append(shipment_id)
+        self.shipment_to_route[shipment_id] = route.id
+        self._state_version += 1
+        self._route_soa["n_shipments"][self._route_row[route.id]] += 1
+
+    def _detach_shipment(self, shipment_id: UUID) -> Optional[Route]:
+        """Remove a shipment from its route, returning the route if it had one"""
+        route_id = self.shipment_to_route.pop(shipment_id, None)
+        route = self.active_routes.get(route_id) if route_id else None
+
+        if route:
+            route.shipment_ids.remove(shipment_id)
+            self._route_soa["n_shipments"][self._route_row[route.id]] -= 1
+            self._state_version += 1
+
+        return route
+
+    def _route_stop_times(self, route: Route) -> np.ndarray:
+        """Scheduled stop times for a route as a float64 POSIX array"""
+        cached = self._stop_times.get(route.id)
+
+        if cached is not None and cached[0] is route.stops and len(cached[1]) == len(route.stops):
+            return cached[1]
+
+        stop_times = np.array(
+            [_posix_seconds(stop.scheduled_time) for stop in route.stops],
+            dtype=np.float64
+        )
+        self._stop_times[route.id] = (route.stops, stop_times)
+
+        return stop_times
+
+    def _route_stop_coords(self, route: Route) -> np.ndarray:
+        """Stop latitudes and longitudes for a route in radians, shape (2, n)"""
+        cached = self._stop_coords.get(route.id)
+
+        if (
+            cached is not None
+            and cached[0] is route.stops
+            and cached[1].shape[1] == len(route.stops)
+        ):
+            return cached[1]
+
+        coords = np.radians(np.array(
+            [[stop.location.latitude for stop in route.stops],
+             [stop.location.longitude for stop in route.stops]],
+            dtype=np.float64
+        ).reshape(2, -1))
+        self._stop_coords[route.id] = (route.stops, coords)
+        self._centroid_dirty = True
+
+        if route.id in self._route_row:
+            self._update_route_centroid(route)
+
+        return coords
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get optimizer statistics"""
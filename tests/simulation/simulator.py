@@ -4,17 +4,35 @@ Logistics Simulator
 Simulates realistic freight operations to test and validate
 the platform's optimization algorithms and ML models.
 """
-import random
+import functools
+import logging
+import multiprocessing
+import operator
+import os
 import numpy as np
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from uuid import uuid4
 import structlog
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - numba is optional
+    NUMBA_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+    pq = None
+
 from src.core.models import (
     Shipment, Carrier, Location, TimeWindow, Dimensions,
-    CommodityType, EquipmentType, ShipmentStatus
+    CommodityType, EquipmentType, ShipmentStatus, uuid4_batch
 )
 from src.core.matching.pooling_engine import PoolingEngine, PoolingConfig
 
@@ -59,6 +77,107 @@ HIGH_VOLUME_LANES = [
     ("Nashville, TN", "Atlanta, GA"),
 ]
 
+# Integer equipment/commodity codes used in sampled shipment columns,
+# mapped back to enums through _EQ/_CM when Shipments are built
+EQ_DRY_VAN, EQ_REEFER, EQ_FLATBED = 0, 1, 2
+_EQ = (EquipmentType.DRY_VAN, EquipmentType.REEFER, EquipmentType.FLATBED)
+
+CM_GENERAL, CM_FOOD_GRADE, CM_HIGH_VALUE = 0, 1, 2
+_CM = (CommodityType.GENERAL, CommodityType.FOOD_GRADE, CommodityType.HIGH_VALUE)
+
+# Cumulative probabilities for binning uniform draws with np.searchsorted:
+# 15% reefer, then 5% of the remainder flatbed, the rest dry van; reefers
+# always carry food, other loads are high value 10% of the time
+EQ_THRESHOLDS = np.array([0.15, 0.15 + 0.85 * 0.05])
+EQ_BIN_CODES = np.array([EQ_REEFER, EQ_FLATBED, EQ_DRY_VAN], dtype=np.int8)
+CM_THRESHOLDS = np.array([0.1])
+CM_BIN_CODES = np.array([  # Indexed by (equipment bin, commodity bin)
+    [CM_FOOD_GRADE, CM_FOOD_GRADE],
+    [CM_HIGH_VALUE, CM_GENERAL],
+    [CM_HIGH_VALUE, CM_GENERAL],
+], dtype=np.int8)
+
+# Struct-of-arrays view of the hubs, indexed by integer hub id
+HUB_CITIES = tuple(name.split(",")[0] for name in US_FREIGHT_HUBS)
+HUB_STATES = tuple(name.split(",")[1].strip() for name in US_FREIGHT_HUBS)
+HUB_LAT = np.array([lat for lat, _ in US_FREIGHT_HUBS.values()])
+HUB_LON = np.array([lon for _, lon in US_FREIGHT_HUBS.values()])
+
+_HUB_INDEX = {name: i for i, name in enumerate(US_FREIGHT_HUBS)}
+HIGH_VOLUME_LANE_IDX = np.array([
+    (_HUB_INDEX[origin], _HUB_INDEX[dest]) for origin, dest in HIGH_VOLUME_LANES
+])
+
+# Shipments sampled and materialized per block, so each block's columns
+# (a few hundred KB) are still cache-resident when turned into objects
+SHIPMENT_BLOCK_SIZE = 4096
+
+# Sampled columns kept after generation for the run metrics
+METRIC_COLUMNS = ("distance_miles", "linear_feet")
+
+
+if NUMBA_AVAILABLE:
+    @njit("f8[:](f8[:], f8[:], f8[:], f8[:])", parallel=True, fastmath=True, cache=True)
+    def _haversine_kernel(lat1, lon1, lat2, lon2):
+        """Fused haversine loop over degree arrays, split across threads"""
+        n = lat1.shape[0]
+        out = np.empty(n)
+        to_rad = np.pi / 180.0
+
+        for i in prange(n):
+            phi1 = lat1[i] * to_rad
+            phi2 = lat2[i] * to_rad
+            a = (
+                np.sin((phi2 - phi1) / 2) ** 2
+                + np.cos(phi1) * np.cos(phi2) * np.sin((lon2[i] - lon1[i]) * to_rad / 2) ** 2
+            )
+            out[i] = 3956 * 2 * np.arcsin(np.sqrt(a))
+
+        return out
+
+
+def _haversine_miles(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized haversine distance in miles between points given in degrees"""
+    if NUMBA_AVAILABLE:
+        return _haversine_kernel(*(
+            np.ascontiguousarray(values, dtype=np.float64)
+            for values in (lat1, lon1, lat2, lon2)
+        ))
+
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 3956 * 2 * np.arcsin(np.sqrt(a))  # Same Earth radius as Location.distance_to
+
+
+def _hours_delta(hours: float) -> np.timedelta64:
+    """Hours as a microsecond-resolution NumPy timedelta"""
+    return np.timedelta64(round(hours * 3.6e9), "us")
+
+
+@functools.lru_cache(maxsize=8)
+def _get_pooling_engine(
+    max_origin_distance_miles: float,
+    max_dest_distance_miles: float,
+    min_time_overlap_hours: float,
+    max_shipments_per_pool: int,
+    min_savings_percent: float,
+    use_advanced_optimization: bool
+) -> PoolingEngine:
+    """Pooling engine for a configuration, shared across simulation runs"""
+    return PoolingEngine(
+        config=PoolingConfig(
+            max_origin_distance_miles=max_origin_distance_miles,
+            max_dest_distance_miles=max_dest_distance_miles,
+            min_time_overlap_hours=min_time_overlap_hours,
+            max_shipments_per_pool=max_shipments_per_pool,
+            min_savings_percent=min_savings_percent,
+            use_advanced_optimization=use_advanced_optimization
+        )
+    )
+
 
 @dataclass
 class SimulationConfig:
@@ -89,9 +208,16 @@ class SimulationConfig:
     # Pooling
     pooling_probability_base: float = 0.6
 
+    # Jitter shipment coordinates around their hub; when off, shipments
+    # share one Location per hub
+    jitter_coords: bool = True
+
     # Randomization
     random_seed: int = 42
 
+    # Simulator log calls are skipped entirely above INFO
+    log_level: int = logging.INFO
+
     def __post_init__(self):
         if self.start_date is None:
             self.start_date = datetime.utcnow()
@@ -113,6 +239,44 @@ class SimulationResult:
     simulation_time_seconds: float
 
 
+# Filled by FreightSimulator.generate_report from SimulationResult fields
+REPORT_TEMPLATE = """
+═══════════════════════════════════════════════════════════════════
+              SHARED LOGISTICS PLATFORM - SIMULATION REPORT
+═══════════════════════════════════════════════════════════════════
+
+SIMULATION PARAMETERS
+─────────────────────
+  Duration:           {simulation_days} days
+  Shipments:          {total_shipments}
+  Carriers:           {num_carriers}
+
+POOLING PERFORMANCE
+─────────────────────
+  Shipments Pooled:   {pooled_shipments} ({pooling_rate:.1f}%)
+  Routes Created:     {routes_created}
+  Avg Utilization:    {average_utilization:.1f}%
+
+FINANCIAL IMPACT
+─────────────────────
+  Cost (Individual):  ${total_cost_individual:,.2f}
+  Cost (Pooled):      ${total_cost_pooled:,.2f}
+  ─────────────────────
+  TOTAL SAVINGS:      ${total_savings:,.2f}
+  Savings Rate:       {savings_percent:.1f}%
+
+OPERATIONAL METRICS
+─────────────────────
+  On-Time Rate:       {on_time_rate:.1f}%
+
+PERFORMANCE
+─────────────────────
+  Simulation Time:    {simulation_time_seconds:.2f} seconds
+
+═══════════════════════════════════════════════════════════════════
+"""
+
+
 class FreightSimulator:
     """
     Simulate realistic freight operations
@@ -126,181 +290,340 @@ class FreightSimulator:
 
     def __init__(self, config: SimulationConfig = None):
         self.config = config or SimulationConfig()
-        self.random = random.Random(self.config.random_seed)
-        np.random.seed(self.config.random_seed)
+        self.rng = np.random.default_rng(self.config.random_seed)
+        self.log_enabled = self.config.log_level <= logging.INFO
+
+        # One shared Location per hub, indexed by hub id
+        self._hub_locations = tuple(
+            Location(city=city, state=state, latitude=lat, longitude=lon)
+            for city, state, lat, lon in zip(
+                HUB_CITIES, HUB_STATES, HUB_LAT.tolist(), HUB_LON.tolist()
+            )
+        )
 
         # State
         self.shipments: List[Shipment] = []
         self.carriers: List[Carrier] = []
         self.routes: List = []
 
+        # Sampled METRIC_COLUMNS, the source of truth for run metrics,
+        # kept alongside a snapshot of the shipments they were built for
+        self._columns: Dict[str, np.ndarray] = {}
+        self._columns_for: Optional[List[Shipment]] = None
+
         # Metrics
         self.metrics: Dict = {}
 
     def generate_shipments(self, num_shipments: int = None) -> List[Shipment]:
-        """Generate realistic shipments"""
-        if num_shipments is None:
-            num_shipments = int(np.random.normal(
-                self.config.shipments_per_day_mean * self.config.simulation_days,
-                self.config.shipments_per_day_std * np.sqrt(self.config.simulation_days)
-            ))
-
+        """
+        Generate realistic shipments
+
+        Shipments are produced in blocks of SHIPMENT_BLOCK_SIZE: every random
+        field of a block is drawn as a NumPy array, and the arrays are zipped
+        into Shipment objects before the next block is sampled.
+        """
+        n = self._shipment_count(num_shipments)
         shipments = []
+        blocks = {name: [] for name in METRIC_COLUMNS}
 
-        for _ in range(num_shipments):
-            shipment = self._generate_single_shipment()
-            shipments.append(shipment)
+        for start in range(0, n, SHIPMENT_BLOCK_SIZE):
+            columns = self._sample_shipment_columns(min(n, start + SHIPMENT_BLOCK_SIZE) - start)
+            shipments.extend(self._materialize_shipments(columns))
+            for name in METRIC_COLUMNS:
+                blocks[name].append(columns[name])
 
         self.shipments = shipments
-        logger.info("generated_shipments", count=len(shipments))
+        self._columns = {
+            name: np.concatenate(parts) if parts else np.empty(0)
+            for name, parts in blocks.items()
+        }
+        self._columns_for = list(shipments)
+        if self.log_enabled:
+            logger.info("generated_shipments", count=len(shipments))
+
         return shipments
 
-    def _generate_single_shipment(self) -> Shipment:
-        """Generate a single realistic shipment"""
-        # Select origin and destination
-        if self.random.random() < 0.7:
-            # Use high volume lane
-            origin_city, dest_city = self.random.choice(HIGH_VOLUME_LANES)
-            if self.random.random() < 0.5:
-                origin_city, dest_city = dest_city, origin_city
-        else:
-            # Random lane
-            origin_city = self.random.choice(list(US_FREIGHT_HUBS.keys()))
-            dest_city = self.random.choice([c for c in US_FREIGHT_HUBS.keys() if c != origin_city])
-
-        origin_coords = US_FREIGHT_HUBS[origin_city]
-        dest_coords = US_FREIGHT_HUBS[dest_city]
-
-        # Add some randomness to exact location (within 30 miles)
-        origin_lat = origin_coords[0] + self.random.uniform(-0.3, 0.3)
-        origin_lon = origin_coords[1] + self.random.uniform(-0.3, 0.3)
-        dest_lat = dest_coords[0] + self.random.uniform(-0.3, 0.3)
-        dest_lon = dest_coords[1] + self.random.uniform(-0.3, 0.3)
-
-        origin = Location(
-            city=origin_city.split(",")[0],
-            state=origin_city.split(",")[1].strip(),
-            latitude=origin_lat,
-            longitude=origin_lon
-        )
+    def generate_shipments_arrow(
+        self,
+        num_shipments: int = None,
+        path: Optional[str] = None
+    ) -> "pa.Table":
+        """
+        Generate shipments as a columnar Arrow table
+
+        Skips building Shipment objects entirely; use Shipment.from_row to
+        materialize individual rows on demand.
+
+        Args:
+            num_shipments: Number of shipments (sampled from the config if None)
+            path: Optional Parquet file to write the table to for replay
+
+        Returns:
+            Table with one row per shipment
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required for columnar shipment output")
+
+        columns = self._sample_shipment_columns(self._shipment_count(num_shipments))
+
+        hub_cities = pa.array(HUB_CITIES)
+        hub_states = pa.array(HUB_STATES)
+        origin_hub = pa.array(columns["origin_hub"], type=pa.int32())
+        dest_hub = pa.array(columns["dest_hub"], type=pa.int32())
+
+        table = pa.table({
+            "origin_city": pa.DictionaryArray.from_arrays(origin_hub, hub_cities),
+            "origin_state": pa.DictionaryArray.from_arrays(origin_hub, hub_states),
+            "origin_lat": columns["origin_lat"],
+            "origin_lon": columns["origin_lon"],
+            "dest_city": pa.DictionaryArray.from_arrays(dest_hub, hub_cities),
+            "dest_state": pa.DictionaryArray.from_arrays(dest_hub, hub_states),
+            "dest_lat": columns["dest_lat"],
+            "dest_lon": columns["dest_lon"],
+            "pickup_start": columns["pickup_start"],
+            "pickup_end": columns["pickup_end"],
+            "delivery_start": columns["delivery_start"],
+            "delivery_end": columns["delivery_end"],
+            "weight_lbs": columns["weight_lbs"],
+            "linear_feet": columns["linear_feet"],
+            "pallet_count": columns["pallet_count"],
+            "stackable": columns["stackable"],
+            "equipment": pa.DictionaryArray.from_arrays(
+                columns["equipment_code"], pa.array([e.value for e in _EQ])
+            ),
+            "commodity": pa.DictionaryArray.from_arrays(
+                columns["commodity_code"], pa.array([c.value for c in _CM])
+            ),
+            "requires_liftgate": columns["requires_liftgate"],
+            "requires_appointment": columns["requires_appointment"],
+        })
+
+        if path is not None:
+            pq.write_table(table, path)
+
+        if self.log_enabled:
+            logger.info("generated_shipments", count=table.num_rows, columnar=True)
+
+        return table
+
+    def _shipment_count(self, num_shipments: Optional[int]) -> int:
+        """Requested shipment count, sampled from the config if not given"""
+        if num_shipments is None:
+            num_shipments = int(self.rng.normal(
+                self.config.shipments_per_day_mean * self.config.simulation_days,
+                self.config.shipments_per_day_std * np.sqrt(self.config.simulation_days)
+            ))
 
-        destination = Location(
-            city=dest_city.split(",")[0],
-            state=dest_city.split(",")[1].strip(),
-            latitude=dest_lat,
-            longitude=dest_lon
+        return max(num_shipments, 0)
+
+    def _sample_shipment_columns(self, n: int) -> Dict[str, np.ndarray]:
+        """Draw every random shipment field for n shipments as NumPy arrays"""
+        config = self.config
+        rng = self.rng
+
+        # Select origin and destination: mostly high volume lanes in either
+        # direction, otherwise a random pair of distinct hubs
+        use_lane = rng.random(n) < 0.7
+        lane = HIGH_VOLUME_LANE_IDX[rng.integers(0, len(HIGH_VOLUME_LANE_IDX), n)]
+        swap = rng.random(n) < 0.5
+        random_origin = rng.integers(0, len(HUB_CITIES), n)
+        random_dest = rng.integers(0, len(HUB_CITIES) - 1, n)
+        random_dest += random_dest >= random_origin  # Skip over the origin hub
+
+        origin_idx = np.where(use_lane, np.where(swap, lane[:, 1], lane[:, 0]), random_origin)
+        dest_idx = np.where(use_lane, np.where(swap, lane[:, 0], lane[:, 1]), random_dest)
+
+        origin_lat = HUB_LAT[origin_idx]
+        origin_lon = HUB_LON[origin_idx]
+        dest_lat = HUB_LAT[dest_idx]
+        dest_lon = HUB_LON[dest_idx]
+
+        if config.jitter_coords:
+            # Add some randomness to exact location (within 30 miles)
+            jitter = rng.uniform(-0.3, 0.3, (n, 4))
+            origin_lat = origin_lat + jitter[:, 0]
+            origin_lon = origin_lon + jitter[:, 1]
+            dest_lat = dest_lat + jitter[:, 2]
+            dest_lon = dest_lon + jitter[:, 3]
+
+        # Delivery based on distance: 50 mph average + handling
+        distances = _haversine_miles(origin_lat, origin_lon, dest_lat, dest_lon)
+        transit_hours = distances / 50 + 6
+
+        # Time windows, as microsecond datetime64 buffers
+        days_offset = rng.integers(0, config.simulation_days, n)
+        hour_offset = rng.integers(6, 19, n)  # Business hours
+        pickup_start = (
+            np.datetime64(config.start_date, "us")
+            + days_offset.astype("timedelta64[D]")
+            + hour_offset.astype("timedelta64[h]")
         )
-
-        # Time windows
-        days_offset = self.random.randint(0, self.config.simulation_days - 1)
-        hour_offset = self.random.randint(6, 18)  # Business hours
-
-        pickup_start = self.config.start_date + timedelta(days=days_offset, hours=hour_offset)
-        pickup_end = pickup_start + timedelta(hours=self.config.pickup_window_hours)
-
-        # Delivery based on distance
-        distance = origin.distance_to(destination)
-        transit_hours = distance / 50 + 6  # 50 mph average + handling
-
-        delivery_start = pickup_start + timedelta(hours=transit_hours)
-        delivery_end = delivery_start + timedelta(hours=self.config.delivery_flexibility_hours)
-
-        pickup_window = TimeWindow(earliest=pickup_start, latest=pickup_end)
-        delivery_window = TimeWindow(earliest=delivery_start, latest=delivery_end)
+        delivery_start = pickup_start + np.round(transit_hours * 3.6e9).astype("timedelta64[us]")
 
         # Dimensions
-        weight = max(1000, np.random.normal(
-            self.config.weight_mean_lbs,
-            self.config.weight_std_lbs
-        ))
-        linear_feet = max(4, min(48, np.random.normal(
-            self.config.linear_feet_mean,
-            self.config.linear_feet_std
-        )))
-        pallet_count = max(1, int(linear_feet / 4))
-
-        dimensions = Dimensions(
-            weight_lbs=weight,
-            linear_feet=linear_feet,
-            pallet_count=pallet_count,
-            stackable=self.random.random() < 0.7
+        weights = np.maximum(1000, rng.normal(config.weight_mean_lbs, config.weight_std_lbs, n))
+        linear_feet = np.clip(
+            rng.normal(config.linear_feet_mean, config.linear_feet_std, n), 4, 48
         )
+        stackable = rng.random(n) < 0.7
+
+        # Equipment and commodity as int8 codes, binned from one draw each
+        eq_bins = np.searchsorted(EQ_THRESHOLDS, rng.random(n), side="right")
+        cm_bins = np.searchsorted(CM_THRESHOLDS, rng.random(n), side="right")
+        equipment_codes = EQ_BIN_CODES[eq_bins]
+        commodity_codes = CM_BIN_CODES[eq_bins, cm_bins]
+
+        return {
+            "origin_hub": origin_idx,
+            "dest_hub": dest_idx,
+            "origin_lat": origin_lat,
+            "origin_lon": origin_lon,
+            "dest_lat": dest_lat,
+            "dest_lon": dest_lon,
+            "distance_miles": distances,
+            "pickup_start": pickup_start,
+            "pickup_end": pickup_start + _hours_delta(config.pickup_window_hours),
+            "delivery_start": delivery_start,
+            "delivery_end": delivery_start + _hours_delta(config.delivery_flexibility_hours),
+            "weight_lbs": weights,
+            "linear_feet": linear_feet,
+            "pallet_count": np.maximum(1, (linear_feet / 4).astype(np.int64)),
+            "stackable": stackable,
+            "equipment_code": equipment_codes,
+            "commodity_code": commodity_codes,
+            "requires_liftgate": rng.random(n) < 0.1,
+            "requires_appointment": rng.random(n) < 0.3,
+        }
+
+    def _materialize_shipments(self, columns: Dict[str, np.ndarray]) -> List[Shipment]:
+        """
+        Build Shipment objects from sampled shipment columns
+
+        Ids and timestamps, the bulk of per-object construction cost, are
+        generated once for the whole batch and passed in explicitly.
+        """
+        config = self.config
+        n = len(columns["origin_hub"])
+        ids = iter(uuid4_batch((4 if config.jitter_coords else 2) * n))
+        now = datetime.now()
+        shipments = []
 
-        # Equipment and commodity
-        equipment = EquipmentType.DRY_VAN
-        if self.random.random() < 0.15:
-            equipment = EquipmentType.REEFER
-        elif self.random.random() < 0.05:
-            equipment = EquipmentType.FLATBED
-
-        commodity = CommodityType.GENERAL
-        if equipment == EquipmentType.REEFER:
-            commodity = CommodityType.FOOD_GRADE
-        elif self.random.random() < 0.1:
-            commodity = CommodityType.HIGH_VALUE
-
-        return Shipment(
-            origin=origin,
-            destination=destination,
-            pickup_window=pickup_window,
-            delivery_window=delivery_window,
-            dimensions=dimensions,
-            equipment_required=equipment,
-            commodity_type=commodity,
-            requires_liftgate=self.random.random() < 0.1,
-            requires_appointment=self.random.random() < 0.3,
-            status=ShipmentStatus.PENDING
-        )
+        # datetime64[us] columns convert to datetime objects in tolist()
+        for (
+            o_idx, d_idx, o_lat, o_lon, d_lat, d_lon, pickup_start, pickup_end,
+            delivery_start, delivery_end, weight, lf, pallets, stack, equipment, commodity,
+            liftgate, appointment
+        ) in zip(*(columns[name].tolist() for name in (
+            "origin_hub", "dest_hub", "origin_lat", "origin_lon", "dest_lat", "dest_lon",
+            "pickup_start", "pickup_end", "delivery_start", "delivery_end",
+            "weight_lbs", "linear_feet",
+            "pallet_count", "stackable", "equipment_code", "commodity_code",
+            "requires_liftgate", "requires_appointment"
+        ))):
+            if config.jitter_coords:
+                origin = Location(
+                    id=next(ids),
+                    city=HUB_CITIES[o_idx],
+                    state=HUB_STATES[o_idx],
+                    latitude=o_lat,
+                    longitude=o_lon
+                )
+
+                destination = Location(
+                    id=next(ids),
+                    city=HUB_CITIES[d_idx],
+                    state=HUB_STATES[d_idx],
+                    latitude=d_lat,
+                    longitude=d_lon
+                )
+            else:
+                origin = self._hub_locations[o_idx]
+                destination = self._hub_locations[d_idx]
+
+            shipments.append(Shipment(
+                id=next(ids),
+                shipper_id=next(ids),
+                origin=origin,
+                destination=destination,
+                pickup_window=TimeWindow(earliest=pickup_start, latest=pickup_end),
+                delivery_window=TimeWindow(earliest=delivery_start, latest=delivery_end),
+                dimensions=Dimensions(
+                    weight_lbs=weight,
+                    linear_feet=lf,
+                    pallet_count=pallets,
+                    stackable=stack
+                ),
+                equipment_required=_EQ[equipment],
+                commodity_type=_CM[commodity],
+                requires_liftgate=liftgate,
+                requires_appointment=appointment,
+                status=ShipmentStatus.PENDING,
+                created_at=now,
+                updated_at=now
+            ))
+
+        return shipments
 
     def generate_carriers(self, num_carriers: int = None) -> List[Carrier]:
         """Generate carrier fleet"""
         if num_carriers is None:
             num_carriers = self.config.num_carriers
 
-        carriers = []
+        rng = self.rng
+        n = num_carriers
 
-        for i in range(num_carriers):
-            # Random starting location
-            city = self.random.choice(list(US_FREIGHT_HUBS.keys()))
-            coords = US_FREIGHT_HUBS[city]
+        # Random starting hub with +/-0.5 degree variation
+        hubs = rng.integers(len(HUB_CITIES), size=n)
+        lats = HUB_LAT[hubs] + rng.uniform(-0.5, 0.5, size=n)
+        lons = HUB_LON[hubs] + rng.uniform(-0.5, 0.5, size=n)
 
-            # Add variation
-            lat = coords[0] + self.random.uniform(-0.5, 0.5)
-            lon = coords[1] + self.random.uniform(-0.5, 0.5)
+        # Equipment distribution: 20% reefer, then 10% of the rest flatbed
+        u = rng.random((2, n))
+        equipment = np.where(
+            u[0] < 0.2, EQ_REEFER, np.where(u[1] < 0.1, EQ_FLATBED, EQ_DRY_VAN)
+        )
 
+        min_rates = rng.uniform(1.8, 2.5, size=n)
+        max_deadheads = rng.uniform(50, 150, size=n)
+        on_time = rng.uniform(90, 99, size=n)
+        damage_free = rng.uniform(97, 100, size=n)
+        acceptance = rng.uniform(60, 95, size=n)
+
+        carriers = []
+
+        for i, (hub, lat, lon, eq, rate, deadhead, ot, df, acc) in enumerate(zip(
+            hubs.tolist(), lats.tolist(), lons.tolist(), equipment.tolist(),
+            min_rates.tolist(), max_deadheads.tolist(), on_time.tolist(),
+            damage_free.tolist(), acceptance.tolist()
+        )):
             location = Location(
-                city=city.split(",")[0],
-                state=city.split(",")[1].strip(),
+                city=HUB_CITIES[hub],
+                state=HUB_STATES[hub],
                 latitude=lat,
                 longitude=lon
             )
 
-            # Equipment distribution
-            equipment = EquipmentType.DRY_VAN
-            if self.random.random() < 0.2:
-                equipment = EquipmentType.REEFER
-            elif self.random.random() < 0.1:
-                equipment = EquipmentType.FLATBED
-
             carrier = Carrier(
                 name=f"Carrier_{i+1:03d}",
                 mc_number=f"MC{100000+i}",
                 dot_number=f"DOT{1000000+i}",
-                equipment_type=equipment,
+                equipment_type=_EQ[eq],
                 current_location=location,
                 available_capacity_linear_feet=53.0,
                 available_weight_lbs=45000.0,
-                min_rate_per_mile=self.random.uniform(1.8, 2.5),
-                max_deadhead_miles=self.random.uniform(50, 150),
-                on_time_percentage=self.random.uniform(90, 99),
-                damage_free_percentage=self.random.uniform(97, 100),
-                acceptance_rate=self.random.uniform(60, 95)
+                min_rate_per_mile=rate,
+                max_deadhead_miles=deadhead,
+                on_time_percentage=ot,
+                damage_free_percentage=df,
+                acceptance_rate=acc
             )
 
             carriers.append(carrier)
 
         self.carriers = carriers
-        logger.info("generated_carriers", count=len(carriers))
+        if self.log_enabled:
+            logger.info("generated_carriers", count=len(carriers))
+
         return carriers
 
     def run_simulation(self) -> SimulationResult:
@@ -308,11 +631,12 @@ class FreightSimulator:
         import time
         start_time = time.time()
 
-        logger.info(
-            "starting_simulation",
-            days=self.config.simulation_days,
-            target_shipments=self.config.shipments_per_day_mean * self.config.simulation_days
-        )
+        if self.log_enabled:
+            logger.info(
+                "starting_simulation",
+                days=self.config.simulation_days,
+                target_shipments=self.config.shipments_per_day_mean * self.config.simulation_days
+            )
 
         # Generate data
         if not self.shipments:
@@ -320,16 +644,14 @@ class FreightSimulator:
         if not self.carriers:
             self.generate_carriers()
 
-        # Run pooling optimization
-        pooling_engine = PoolingEngine(
-            config=PoolingConfig(
-                max_origin_distance_miles=50,
-                max_dest_distance_miles=50,
-                min_time_overlap_hours=2,
-                max_shipments_per_pool=4,
-                min_savings_percent=10,
-                use_advanced_optimization=True
-            )
+        # Run pooling optimization; the engine keeps no per-run state
+        pooling_engine = _get_pooling_engine(
+            max_origin_distance_miles=50,
+            max_dest_distance_miles=50,
+            min_time_overlap_hours=2,
+            max_shipments_per_pool=4,
+            min_savings_percent=10,
+            use_advanced_optimization=True
         )
 
         pooling_result = pooling_engine.find_pooling_opportunities(
@@ -338,15 +660,15 @@ class FreightSimulator:
         )
 
         # Calculate metrics
-        total_individual_cost = sum(
-            s.distance_miles * 2.5 + 50
-            for s in self.shipments
-        )
+        columns = self._shipment_columns()
+        dists = columns["distance_miles"]
+        lf = columns["linear_feet"]
+        total_individual_cost = float((dists * 2.5 + 50).sum())
 
         total_pooled_cost = total_individual_cost - pooling_result.total_potential_savings
 
         # Utilization
-        total_capacity_used = sum(s.dimensions.linear_feet for s in self.shipments)
+        total_capacity_used = float(lf.sum())
         num_trucks_needed_individual = len(self.shipments)
         num_trucks_needed_pooled = len(self.shipments) - pooling_result.shipments_pooled + len(pooling_result.opportunities)
 
@@ -369,55 +691,71 @@ class FreightSimulator:
             simulation_time_seconds=simulation_time
         )
 
-        logger.info(
-            "simulation_complete",
-            total_shipments=result.total_shipments,
-            pooling_rate=f"{result.pooling_rate:.1f}%",
-            savings_percent=f"{result.savings_percent:.1f}%",
-            total_savings=f"${result.total_savings:,.2f}",
-            simulation_time=f"{result.simulation_time_seconds:.2f}s"
-        )
+        if self.log_enabled:
+            logger.info(
+                "simulation_complete",
+                total_shipments=result.total_shipments,
+                pooling_rate=f"{result.pooling_rate:.1f}%",
+                savings_percent=f"{result.savings_percent:.1f}%",
+                total_savings=f"${result.total_savings:,.2f}",
+                simulation_time=f"{result.simulation_time_seconds:.2f}s"
+            )
 
         return result
 
+    def _shipment_columns(self) -> Dict[str, np.ndarray]:
+        """
+        METRIC_COLUMNS for the current shipments
+
+        If self.shipments no longer holds exactly the generated shipments
+        (replaced, or edited in place), the distance and linear feet columns
+        are rebuilt from the Shipment objects.
+        """
+        shipments = self.shipments
+        snapshot = self._columns_for
+        if snapshot is None or len(snapshot) != len(shipments) or not all(
+            map(operator.is_, snapshot, shipments)
+        ):
+            n = len(shipments)
+
+            def column(getter):
+                return np.fromiter((getter(s) for s in shipments), dtype=np.float64, count=n)
+
+            self._columns = {
+                "distance_miles": _haversine_miles(
+                    column(lambda s: s.origin.latitude),
+                    column(lambda s: s.origin.longitude),
+                    column(lambda s: s.destination.latitude),
+                    column(lambda s: s.destination.longitude)
+                ),
+                "linear_feet": column(lambda s: s.dimensions.linear_feet),
+            }
+            self._columns_for = list(shipments)
+
+        return self._columns
+
     def generate_report(self, result: SimulationResult) -> str:
         """Generate simulation report"""
-        report = f"""
-═══════════════════════════════════════════════════════════════════
-              SHARED LOGISTICS PLATFORM - SIMULATION REPORT
-═══════════════════════════════════════════════════════════════════
+        return REPORT_TEMPLATE.format_map({
+            **asdict(result),
+            "simulation_days": self.config.simulation_days,
+            "num_carriers": len(self.carriers),
+        })
 
-SIMULATION PARAMETERS
-─────────────────────
-  Duration:           {self.config.simulation_days} days
-  Shipments:          {result.total_shipments}
-  Carriers:           {len(self.carriers)}
 
-POOLING PERFORMANCE
-─────────────────────
-  Shipments Pooled:   {result.pooled_shipments} ({result.pooling_rate:.1f}%)
-  Routes Created:     {result.routes_created}
-  Avg Utilization:    {result.average_utilization:.1f}%
-
-FINANCIAL IMPACT
-─────────────────────
-  Cost (Individual):  ${result.total_cost_individual:,.2f}
-  Cost (Pooled):      ${result.total_cost_pooled:,.2f}
-  ─────────────────────
-  TOTAL SAVINGS:      ${result.total_savings:,.2f}
-  Savings Rate:       {result.savings_percent:.1f}%
-
-OPERATIONAL METRICS
-─────────────────────
-  On-Time Rate:       {result.on_time_rate:.1f}%
+def _benchmark_config(seed: int = 42) -> SimulationConfig:
+    """Benchmark scenario for a given random seed"""
+    return SimulationConfig(
+        simulation_days=7,
+        shipments_per_day_mean=100,
+        num_carriers=50,
+        random_seed=seed
+    )
 
-PERFORMANCE
-─────────────────────
-  Simulation Time:    {result.simulation_time_seconds:.2f} seconds
 
-═══════════════════════════════════════════════════════════════════
-"""
-        return report
+def _run_one(config: SimulationConfig) -> SimulationResult:
+    """Run one simulation (process pool worker)"""
+    return FreightSimulator(config).run_simulation()
 
 
 def run_benchmark():
@@ -426,12 +764,7 @@ def run_benchmark():
     print("Running Shared Logistics Platform Benchmark")
     print("="*70 + "\n")
 
-    config = SimulationConfig(
-        simulation_days=7,
-        shipments_per_day_mean=100,
-        num_carriers=50,
-        random_seed=42
-    )
+    config = _benchmark_config()
 
     simulator = FreightSimulator(config)
     result = simulator.run_simulation()
@@ -442,5 +775,45 @@ def run_benchmark():
     return result
 
 
+def run_benchmark_sweep(
+    n_seeds: int = 8,
+    n_workers: Optional[int] = None,
+    config: Optional[SimulationConfig] = None
+) -> List[SimulationResult]:
+    """
+    Run a scenario over seeds 0..n_seeds-1 in parallel
+
+    Each seed is an independent simulation, so runs are spread across
+    worker processes. Workers are spawned rather than forked, since the
+    solver and JIT thread pools are not fork-safe.
+
+    Args:
+        n_seeds: Number of seeds to simulate
+        n_workers: Worker processes (defaults to the CPU count)
+        config: Scenario to sweep (defaults to the benchmark scenario with
+            simulator logging at WARNING)
+
+    Returns:
+        One SimulationResult per seed, in seed order
+    """
+    base = config or replace(_benchmark_config(), log_level=logging.WARNING)
+    configs = [replace(base, random_seed=seed) for seed in range(n_seeds)]
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = list(executor.map(_run_one, configs))
+
+    pooling_rates = np.array([r.pooling_rate for r in results])
+    savings_percents = np.array([r.savings_percent for r in results])
+
+    print(f"Benchmark sweep over {n_seeds} seeds")
+    print(f"  Pooling Rate:  {pooling_rates.mean():.1f}% ± {pooling_rates.std():.1f}%")
+    print(f"  Savings Rate:  {savings_percents.mean():.1f}% ± {savings_percents.std():.1f}%")
+
+    return results
+
+
 if __name__ == "__main__":
     run_benchmark()